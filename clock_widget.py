@@ -1,12 +1,20 @@
+import queue
+import threading
 import tkinter as tk
-from datetime import datetime
+from datetime import datetime, date
 import logging as logger
 from tools import Tools
+from file_watcher import FileWatcher
+from diyanet_api import DiyanetApi
 
 
 class ClockWidget:
     def __init__(self, root):
         self.root = root
+        self.commands = queue.Queue()  # Diğer kopyalardan gelen komutlar (SingleInstance)
+        self._fetching = False  # Arka planda vakit indirme sürüyor mu
+        self._missing_reported = False  # Vakit kalmadığında tek sefer indir/ayarları aç
+        self._prefetching_districts = False
         self._settings = Tools.get_settings()  # Ayarları doğrudan Tools'dan al
         self._prayer_times = Tools.get_prayer_times() # {date: [time1, time2, ...]}
         self._next_prayer_time = Tools.find_next_prayer_time(self._prayer_times) # datetime object "%Y-%m-%d %H:%M"
@@ -39,12 +47,15 @@ class ClockWidget:
         self.setup_bindings()
         self.create_context_menu()
 
-        if not Tools.PRAYER_TIMES.exists() or not self._prayer_times:
+        if not self._prayer_times:
             logger.info("Vakitler dosyası bulunamadı. Ayarlar penceresi açılıyor...")
             self.root.after(1000, lambda: self.open_settings(None))
 
         self.update_clock()
         self.keep_on_top()
+        self.start_hot_reload()
+        self.root.after(5000, self.check_archive)
+        self.root.after(10000, self.prefetch_districts)
 
     def set_window_geometry(self):
         try:
@@ -176,30 +187,206 @@ class ClockWidget:
         self.window.after(5000, self.keep_on_top)
 
 
-    def update_clock(self):
-        if self._next_prayer_time:
-            self.update_remaining_time_display()
+    def start_hot_reload(self):
+        """Dışarıdan değişen ayar ve vakit dosyalarını yeniden başlatmadan uygular."""
+        self._reload_queue = queue.Queue()
+        self.file_watcher = FileWatcher([Tools.SETTINGS, Tools.PRAYER_TIMES], self._on_file_changed).start()
+        self.apply_reloads()
+
+    def _on_file_changed(self, path):
+        # İzleyici thread'inde çalışır: okuma ve doğrulama arayüzü bekletmez
+        data, stat = Tools.load_for_reload(path)
+        if data is not None:
+            self._reload_queue.put((path, (data, stat)))
+
+    def check_archive(self):
+        """Arşiv eskiyse veya başka ilçeye aitse yılda bir kez arka planda indirir; 6 saatte bir bakar."""
+        if Tools.archive_is_stale():
+            logger.info("Vakit arşivi güncel değil, yıllık vakitler indiriliyor...")
+            self.fetch_prayer_times_async()
+        self.root.after(6 * 60 * 60 * 1000, self.check_archive)
+
+    def fetch_prayer_times_async(self):
+        if self._fetching:
+            return
+        self._fetching = True
+        district_id = self._settings["LOCATION"]["district"]["id"]
+
+        def fetch():
+            try:
+                times = DiyanetApi().fetch_yearly_prayer_times(district_id)
+            except Exception as e:
+                logger.error(f"Vakitler indirilemedi: {e}")
+                times = None
+            self._reload_queue.put(("archive", (district_id, times)))
+
+        threading.Thread(target=fetch, name="PrayerTimesFetch", daemon=True).start()
+
+    def prefetch_districts(self):
+        """Tüm illerin ilçe listesini bir kez arka planda indirir; arama ağ beklemeden çalışsın."""
+        missing = Tools.missing_district_cities()
+        if not missing or self._prefetching_districts:
+            return
+        self._prefetching_districts = True
+        logger.info(f"{len(missing)} ilin ilçe listesi arka planda indiriliyor...")
+
+        def fetch():
+            api = DiyanetApi()
+            for city in missing:
+                try:
+                    if districts := api.get_districts(city['id']):
+                        self._reload_queue.put(("districts", (city['id'], districts)))
+                except Exception as e:  # Bir ilin hatası diğerlerini durdurmasın
+                    logger.error(f"{city['il']} ilçeleri indirilemedi: {e}")
+            self._reload_queue.put(("districts", None))
+
+        threading.Thread(target=fetch, name="DistrictPrefetch", daemon=True).start()
+
+    def apply_archive(self, district_id, times):
+        self._fetching = False
+        if times:
+            self._prayer_times = Tools.update_prayer_archive(district_id, times)
+            self._next_prayer_time = Tools.find_next_prayer_time(self._prayer_times)
+            self._missing_reported = False
+            logger.info(f"Vakitler arka planda güncellendi ({len(times)} gün).")
+        elif not self._next_prayer_time:
+            logger.error("Vakitler güncellenemedi. Ayarlar penceresi açılıyor...")
+            self.open_settings(None)
         else:
-            self.label.config(text="00")
+            logger.error("Vakitler güncellenemedi, mevcut vakitlerle devam ediliyor.")
 
-        if not self.is_dragging:  # Sürükleme yapılmıyorsa pencere boyutunu güncelle
-            self.update_window_geometry()
+    def apply_reloads(self):
+        # Tk sadece ana thread'den güncellenir
+        self.handle_commands()
+        districts = {}
+        try:
+            while True:
+                path, data = self._reload_queue.get_nowait()
+                if path == "districts":
+                    if data is None:
+                        self._prefetching_districts = False
+                        logger.info("İlçe listesi indirme tamamlandı.")
+                    else:
+                        districts[data[0]] = data[1]
+                elif path == "archive":
+                    self.apply_archive(*data)
+                elif path in (Tools.SETTINGS, Tools.PRAYER_TIMES):
+                    data, stat = data
+                    # Okunduktan sonra dosya yeniden yazıldıysa (ör. sürükleme kaydı) eski içeriği uygulama
+                    if stat != Tools.file_stat(path) or Tools.is_own_write(path, stat):
+                        continue
+                    if path == Tools.SETTINGS and data != self._settings:
+                        self.apply_settings(data)
+                    elif path == Tools.PRAYER_TIMES and data != self._prayer_times:
+                        self.apply_prayer_times(data)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logger.error(f"Yeniden yükleme uygulanamadı: {e}")
+        if districts:
+            Tools.update_districts_many(districts)  # Bu turda gelen illeri tek yazışta kaydet
+        self.root.after(500, self.apply_reloads)
+
+    def handle_commands(self):
+        while not self.commands.empty():
+            command = self.commands.get_nowait()
+            try:
+                if command == "settings":
+                    self.open_settings(None)
+                elif command == "refresh":
+                    self.fetch_prayer_times_async()
+                elif command == "quit":
+                    self.close_program()
+                else:
+                    self.window.deiconify()
+                    self.window.lift()
+            except Exception as e:
+                logger.error(f"'{command}' komutu işlenemedi: {e}")
+
+    def apply_settings(self, settings):
+        """Yeni ayarları önce Tk'ye uygular; Tk reddederse eski ayarlara döner, hiçbir şey yarım kalmaz."""
+        try:
+            for colors in settings["COLORS"].values():
+                self.window.winfo_rgb(colors["background"])
+                self.window.winfo_rgb(colors["text"])
+            self._apply_window_settings(settings)
+        except tk.TclError as e:
+            logger.error(f"{Tools.SETTINGS.name} uygulanamadı, önceki ayarlar korunuyor: {e}")
+            self._apply_window_settings(self._settings)
+            return
+
+        logger.info(f"{Tools.SETTINGS.name} değişti, ayarlar yeniden yüklendi.")
+        Tools._settings = self._settings = settings
+        if not self.is_dragging:
+            self.set_window_geometry()
+        # Açık ayarlar penceresi eski sözlükle kaydedip yeni dosyanın üzerine yazmasın
+        settings_window = getattr(self.root, 'settings_window', None)
+        if settings_window and settings_window.window.winfo_exists():
+            settings_window.reload(settings)
+
+    def _apply_window_settings(self, settings):
+        font_settings = settings["FONTS"]["clock"]
+        self.label.config(font=(font_settings["family"], font_settings["size"], font_settings["weight"]))
+        self.window.attributes('-topmost', settings["DISPLAY"]["always_on_top"])
+
+    def apply_prayer_times(self, prayer_times):
+        logger.info(f"{Tools.PRAYER_TIMES.name} değişti, vakitler yeniden yüklendi.")
+        if date.today().isoformat() in prayer_times:
+            Tools.update_prayer_times_cache(prayer_times)
+        else:
+            # Dosya bugünü kapsamıyor: ayın geri kalanına sabitleme, arşivle birlikte yeniden seç
+            Tools.invalidate_prayer_times()
+            prayer_times = Tools.get_prayer_times()
+        self._prayer_times = prayer_times
+        self._next_prayer_time = Tools.find_next_prayer_time(prayer_times)
+        self._missing_reported = False
+
+    def update_clock(self):
+        try:
+            if not self._next_prayer_time:
+                # Ay değişmiş olabilir: önbellek bugünü kapsayan kaynağı yeniden seçer
+                self._prayer_times = Tools.get_prayer_times()
+                self._next_prayer_time = Tools.find_next_prayer_time(self._prayer_times)
+
+            if self._next_prayer_time:
+                self.update_remaining_time_display()
+            else:
+                self.label.config(text="00")
+                self.on_prayer_times_missing()
+
+            if not self.is_dragging:  # Sürükleme yapılmıyorsa pencere boyutunu güncelle
+                self.update_window_geometry()
+        except Exception as e:  # Geri sayım hiçbir hatada durmamalı
+            logger.error(f"Saat güncellenirken hata: {e}")
 
         # Güncelleme sıklığını kontrol et
-        interval = 1000 if self._settings["DISPLAY"]["show_seconds"] else 60000
+        interval = 1000 if self._settings["DISPLAY"].get("show_seconds", True) else 60000
         self.root.after(interval, self.update_clock)
 
     # Kalan süreyi güncelle ve göster
     def update_remaining_time_display(self):
         now = datetime.now()
         if now >= self._next_prayer_time: # Eğer vakit geçtiyse
-            # Bir sonraki vakti bul ve güncelle
+            # Bir sonraki vakti bul ve güncelle (ay değiştiyse arşivden yeni pencere gelir)
+            self._prayer_times = Tools.get_prayer_times()
             self._next_prayer_time = Tools.find_next_prayer_time(self._prayer_times)
 
+        if not self._next_prayer_time:
+            self.label.config(text="00")
+            return self.on_prayer_times_missing()
+
         hours, minutes, seconds = Tools.remaining_time(self._next_prayer_time)
         self.update_color_by_time(hours * 60 + minutes) # Renk güncelle
         self.label.config(text=self.format_time(hours, minutes, seconds))
 
+    def on_prayer_times_missing(self):
+        """Vakitler tükendiğinde bir kez indirmeyi dener, olmazsa ayarlar penceresini açar."""
+        if self._missing_reported:
+            return
+        self._missing_reported = True
+        logger.warning("Sıradaki vakit bulunamadı, vakitler indiriliyor...")
+        self.fetch_prayer_times_async()
+
     def format_time(self, hours, minutes, seconds) -> str:
         """Saat metnini ayarlardaki formatlara göre döndür"""
         display = self._settings["DISPLAY"]
@@ -3,15 +3,17 @@ import requests
 import json
 import logging as logger
 from bs4 import BeautifulSoup
+from timetable_validator import TimetableValidator
 
 
 class DiyanetApi:
     BASE_URL = "https://namazvakitleri.diyanet.gov.tr/tr-TR/"
+    TIMEOUT = 30  # saniye; arka planda takılıp kalmasın
 
     def _make_request(self, url, params=None):
         try:
             logger.info(f"API isteği yapılıyor: {url}")
-            response = requests.get(url, params=params)
+            response = requests.get(url, params=params, timeout=self.TIMEOUT)
             response.raise_for_status()
             return response
         except requests.RequestException as e:
@@ -27,22 +29,44 @@ class DiyanetApi:
 
     def fetch_prayer_times(self, district_id):
         url = f"{self.BASE_URL}{district_id}"
-        response = self._make_request(url)
-        return self.parse_times(response.text)
+        if response := self._make_request(url):
+            return self._validated(self.parse_times(response.text))
+        return None
 
-    def parse_times(self, html_content):
+    def fetch_yearly_prayer_times(self, district_id):
+        """Sayfadaki tüm sekmeleri (aylık, yıllık) okuyarak mümkün olan en uzun aralığı döndürür."""
+        url = f"{self.BASE_URL}{district_id}"
+        if response := self._make_request(url):
+            return self._validated(self.parse_times(response.text, all_tabs=True))
+        return None
+
+    def parse_times(self, html_content, all_tabs=False):
         soup = BeautifulSoup(html_content, 'html.parser')
         logger.info(f"Soup: {soup.title.string}")
-        table = soup.select_one("#tab-1 .vakit-table tbody")
+        selector = "[id^='tab-'] .vakit-table tbody" if all_tabs else "#tab-1 .vakit-table tbody"
+        tables = soup.select(selector) if all_tabs else [soup.select_one(selector)]
 
-        if not table:
+        if not any(tables):
             logger.error("Vakit tablosu bulunamadı")
             return None
 
+        data = {}
+        for table in filter(None, tables):
+            data.update(self._parse_table(table))
+        return dict(sorted(data.items()))
+
+    @staticmethod
+    def _validated(data):
+        """Hatalı sayfa iyi önbelleğin yerine geçmesin diye doğrulanmayan tablo None döner."""
+        return data if data and TimetableValidator().is_valid(data, "İndirilen vakit tablosu") else None
+
+    def _parse_table(self, table):
         data = {}
         for row in table.find_all("tr"):
             cells = [td.text.strip() for td in row.find_all("td")]
-            tarih = cells[0].split()[:3]
+            tarih = cells[0].split()[:3] if cells else []
+            if len(tarih) < 3:
+                continue  # Eksik gün doğrulamada yakalanır
             tarih_iso = f"{tarih[2]}-{self.month_to_number(tarih[1])}-{tarih[0]}"
             vakitler = cells[2:]
             data[tarih_iso] = vakitler
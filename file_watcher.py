@@ -0,0 +1,121 @@
+import os
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+import logging as logger
+
+
+class FileWatcher:
+    """Verilen dosyaları izler, değiştiklerinde `callback(path)` çağırır (izleyici thread'inde).
+
+    Linux'ta inotify kullanılır; olmadığı yerde dosyaların mtime/boyut bilgisine
+    yavaş aralıklarla bakılır. Dosyalar genelde yeniden adlandırılarak değiştirildiği
+    için dosyanın kendisi değil bulunduğu klasör izlenir. Dosya bir sembolik bağsa
+    hem bağın hem de hedefin klasörü izlenir; böylece inotify ile stat kontrolü aynı
+    değişiklikleri görür.
+    """
+    POLL_INTERVAL = 5  # saniye, inotify yoksa
+    DEBOUNCE = 0.3  # Art arda gelen yazma olaylarını tek seferde topla
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_NONBLOCK = 0o4000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, paths, callback):
+        self.paths = list(paths)
+        # (klasör, dosya adı) -> kullanıcıya bildirilecek asıl yol
+        self._targets = {}
+        for path in self.paths:
+            for form in (path.absolute(), path.resolve()):
+                self._targets[(form.parent, form.name)] = path
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        target = self._run_inotify if self._inotify_fd() is not None else self._run_polling
+        self._thread = threading.Thread(target=target, name="FileWatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _inotify_fd(self):
+        if not hasattr(self, "_fd"):
+            self._fd = None
+            if sys.platform.startswith("linux"):
+                try:
+                    self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+                    fd = self._libc.inotify_init1(self.IN_NONBLOCK)
+                    if fd >= 0:
+                        self._fd = fd
+                except (OSError, AttributeError) as e:
+                    logger.warning(f"inotify kullanılamıyor, dosya kontrolüne geçiliyor: {e}")
+        return self._fd
+
+    def _run_inotify(self):
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        self._folders = {}  # watch descriptor -> klasör
+        for folder in {folder for folder, _ in self._targets}:
+            wd = self._libc.inotify_add_watch(self._fd, str(folder).encode(), mask)
+            if wd < 0:
+                logger.error(f"{folder} izlenemiyor (errno {ctypes.get_errno()}), dosya kontrolüne geçiliyor.")
+                os.close(self._fd)
+                return self._run_polling()
+            self._folders[wd] = folder
+        logger.info(f"inotify ile izleniyor: {', '.join(p.name for p in self.paths)}")
+
+        try:
+            while not self._stop.is_set():
+                if not select.select([self._fd], [], [], 1.0)[0]:
+                    continue
+                self._stop.wait(self.DEBOUNCE)
+                changed = {self._targets.get((self._folders.get(wd), name))
+                           for wd, name in self._read_events()} - {None}
+                for path in changed:
+                    self._notify(path)
+        finally:
+            os.close(self._fd)
+
+    def _read_events(self):
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buffer):
+            wd, _, _, length = self._EVENT.unpack_from(buffer, offset)
+            offset += self._EVENT.size
+            yield wd, buffer[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+    def _run_polling(self):
+        logger.info(f"Dosyalar {self.POLL_INTERVAL} sn aralıkla kontrol ediliyor.")
+        last = {p: self._stat(p) for p in self.paths}
+        while not self._stop.wait(self.POLL_INTERVAL):
+            for path in self.paths:
+                if (current := self._stat(path)) != last[path]:
+                    last[path] = current
+                    if current is not None:
+                        self._notify(path)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = path.stat()
+            return st.st_ino, st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _notify(self, path):
+        try:
+            self.callback(path)
+        except Exception as e:  # İzleyici thread'i hiçbir durumda ölmemeli
+            logger.error(f"{path.name} değişikliği işlenirken hata: {e}")
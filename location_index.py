@@ -0,0 +1,83 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+
+class LocationIndex:
+    """İl ve önbellekteki ilçeler üzerinde yazarken arama için önceden kurulmuş indeks.
+
+    İsimler Türkçe kurallarıyla küçük harfe çevrilip ASCII'ye indirgenir ("İzmir",
+    "izmir", "IZMIR" aynı sonucu verir). Önce sıralı kelime listesinde önek araması
+    yapılır, yeterli sonuç yoksa üçlü harf (trigram) benzerliğine bakılır.
+    """
+    _FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+    _SPLIT = re.compile(r"[^a-z0-9]+")
+    # Listede kısaltılmış il adlarının yaygın yazılışları
+    ALIASES = {"K.Maraş": "Kahramanmaraş", "Afyon": "Afyonkarahisar"}
+
+    def __init__(self, cities, districts=None):
+        """cities: Tools.get_cities() listesi, districts: {il_id: {ilçe_adı: ilçe_id}}"""
+        self.entries = []  # {"label", "key", "city", "district"}
+        self._prefixes = []  # Sıralı (kelime, entry_no)
+        self._trigrams = defaultdict(set)
+        self._by_plate = defaultdict(list)
+
+        for city in cities:
+            self._add(f"{city['il']} ({city['plaka']})", city['il'], city, None, self.ALIASES.get(city['il']))
+            for name, district_id in (districts or {}).get(city['id'], {}).items():
+                self._add(f"{name} / {city['il']}", name, city, {"name": name, "id": district_id})
+        self._prefixes.sort()
+
+    @classmethod
+    def normalize(cls, text):
+        text = str(text).replace("I", "ı").replace("İ", "i").lower()
+        return text.translate(cls._FOLD).strip()
+
+    @staticmethod
+    def trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _add(self, label, name, city, district, alias=None):
+        key = self.normalize(name)
+        number = len(self.entries)
+        self.entries.append({"label": label, "key": key, "city": city, "district": district})
+        self._by_plate[city['plaka']].append(number)
+        for text in filter(None, (key, alias and self.normalize(alias))):
+            for word in {text, *self._SPLIT.split(text)} - {""}:
+                self._prefixes.append((word, number))
+            for gram in self.trigrams(text):
+                self._trigrams[gram].add(number)
+
+    def search(self, query, limit=20):
+        """Sorguya en uygun kayıtları sıralı olarak döndürür."""
+        query = self.normalize(query)
+        if not query:
+            return []
+        if query.isdigit():
+            return [self.entries[n] for n in self._by_plate.get(query.zfill(2), [])[:limit]]
+
+        scores = {}
+        start = bisect_left(self._prefixes, (query,))
+        for word, number in self._prefixes[start:]:
+            if not word.startswith(query):
+                break
+            key = self.entries[number]["key"]
+            # Tam eşleşme > ismin başı > içindeki bir kelimenin başı
+            score = 3 if key == query else 2 if key.startswith(query) else 1
+            scores[number] = max(scores.get(number, 0), score)
+
+        if (limit is None or len(scores) < limit) and len(query) > 2:
+            query_grams = self.trigrams(query)
+            shared = defaultdict(int)
+            for gram in query_grams:
+                for number in self._trigrams.get(gram, ()):
+                    shared[number] += 1
+            for number, count in shared.items():
+                similarity = count / len(query_grams)
+                if similarity >= 0.4 and number not in scores:
+                    scores[number] = similarity
+
+        ranked = sorted(scores, key=lambda n: (-scores[n], self.entries[n]["district"] is not None,
+                                               self.entries[n]["key"]))
+        return [self.entries[n] for n in ranked[:limit]]
@@ -1,23 +1,42 @@
+import sys
 import logging as logger
 import tkinter as tk
 from tools import Tools
 from clock_widget import ClockWidget
+from single_instance import SingleInstance
+
+# Komut satırı seçeneği -> çalışan kopyaya iletilecek komut
+COMMAND_ARGS = {"--settings": "settings", "--refresh": "refresh", "--quit": "quit"}
 
 if __name__ == "__main__":
     try:
         tools = Tools()
         tools.configure_logging("INFO")
+        command = next((COMMAND_ARGS[a] for a in sys.argv[1:] if a in COMMAND_ARGS), "show")
+
+        instance = SingleInstance(Tools.LOCK_FILE, Tools.PORT_FILE)
+        if not instance.acquire():
+            logger.info(f"Program zaten çalışıyor, '{command}' komutu iletiliyor.")
+            sys.exit(0 if instance.send(command) else 1)
+
         logger.info("-------Program başlatıldı-------")
 
         root = tk.Tk()
         root.withdraw()  # Ana pencereyi gizle
         clock_widget = ClockWidget(root)
         root.clock_widget = clock_widget  # ClockWidget'a referans ekle
-        root.mainloop()
+        instance.serve(clock_widget.commands.put)
+        if command != "show":
+            clock_widget.commands.put(command)
+        try:
+            root.mainloop()
+        finally:
+            Tools.close_shared_schedule()
+            instance.release()
     except KeyboardInterrupt:
         logger.info("Program kapatıldı")
     except Exception as e:
         logger.error(f"Program başlatılırken hata oluştu: {e}")
         raise
 
-# pyinstaller --onefile --noconsole main.py
\ No newline at end of file
+# pyinstaller --onefile --noconsole main.py
@@ -0,0 +1,87 @@
+import json
+import zipfile
+import logging as logger
+from datetime import date
+
+
+class PrayerArchive:
+    """Yıllık vakitleri ay ay sıkıştırılmış (LZMA) tek bir dosyada saklar.
+
+    Her ay arşivde ayrı bir üye olarak ("2024-11.json") tutulur; zip'in merkezi
+    dizini indeks görevi görür, böylece sadece istenen ayın verisi açılır.
+    """
+    INDEX = "index.json"
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+        self._months = {}  # {"2024-11": {"2024-11-05": [...], ...}}
+
+    @staticmethod
+    def month_key(day):
+        return f"{day.year}-{day.month:02}"
+
+    @classmethod
+    def save(cls, path, district_id, prayer_times):
+        """{tarih: [vakitler]} sözlüğünü aylara bölüp arşive yazar."""
+        months = {}
+        for day, times in sorted(prayer_times.items()):
+            months.setdefault(day[:7], {})[day] = times
+
+        index = {"district_id": str(district_id),
+                 "fetched": date.today().isoformat(),
+                 "months": sorted(months)}
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_LZMA) as archive:
+            archive.writestr(cls.INDEX, json.dumps(index))
+            for month, days in months.items():
+                archive.writestr(f"{month}.json", json.dumps(days, separators=(',', ':')))
+        tmp_path.replace(path)  # Yarım yazılmış arşiv eskisinin yerine geçmesin
+        logger.info(f"{path.name} arşivi kaydedildi: {len(months)} ay, {len(prayer_times)} gün.")
+        return cls(path)
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with zipfile.ZipFile(self.path) as archive:
+                    self._index = json.loads(archive.read(self.INDEX))
+            except (FileNotFoundError, KeyError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+                logger.error(f"{self.path.name} arşivi okunamadı: {e}")
+                self._index = {"district_id": None, "fetched": None, "months": []}
+        return self._index
+
+    def get_month(self, month):
+        """Tek bir ayı gerektiğinde açar ve bellekte tutar."""
+        if month not in self._months:
+            if month not in self.index["months"]:
+                return {}
+            try:
+                with zipfile.ZipFile(self.path) as archive:
+                    self._months[month] = json.loads(archive.read(f"{month}.json"))
+            except (FileNotFoundError, KeyError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+                logger.error(f"{self.path.name} arşivinden {month} okunamadı: {e}")
+                return {}
+        return self._months[month]
+
+    def get_window(self, day=None, months=2):
+        """Verilen günün ayından başlayarak `months` aylık vakitleri döndürür."""
+        day = day or date.today()
+        year, month = day.year, day.month
+        window = {}
+        for _ in range(months):
+            window.update(self.get_month(f"{year}-{month:02}"))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return window
+
+    def covers(self, day=None):
+        day = day or date.today()
+        return day.isoformat() in self.get_month(self.month_key(day))
+
+    def is_fresh(self, district_id, day=None):
+        """Arşiv aynı ilçeye ait ve bu yıl indirilmişse yeniden indirmeye gerek yok."""
+        day = day or date.today()
+        fetched = self.index.get("fetched") or ""
+        return (self.index.get("district_id") == str(district_id)
+                and fetched[:4] == str(day.year) and self.covers(day))
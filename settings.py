@@ -29,16 +29,13 @@ class SettingsWindow:
         select_frame = ctk.CTkFrame(self.window)
         select_frame.pack(fill='x', padx=10, pady=5) # pady genel üst ve alt boşluk
         
-        # İl seçimi
+        # İl/ilçe arama: isim (Türkçe karakterler fark etmez) veya plaka
         city_frame = ctk.CTkFrame(select_frame)
         city_frame.pack(fill='x', padx=10, pady=10)
-        ctk.CTkLabel(city_frame, text="Plaka:", width=60).pack(side='left', padx=5)
-        self.city_entry = ctk.CTkEntry(city_frame, width=60)
+        ctk.CTkLabel(city_frame, text="Ara:", width=60).pack(side='left', padx=5)
+        self.city_entry = ctk.CTkEntry(city_frame, width=160, placeholder_text="İl, ilçe veya plaka")
         self.city_entry.pack(side='left', padx=5)
-        
-        if current_city := next((c for c in Tools.get_cities() 
-                               if c['id'] == loc['city']['id']), None):
-            self.city_entry.insert(0, current_city['plaka'])
+        self.city_entry.bind('<KeyRelease>', self._search_locations)
         
         ctk.CTkButton(city_frame, text="İlçeleri Getir", width=100,
                      command=self._fetch_districts).pack(side='right', padx=5)
@@ -50,6 +47,10 @@ class SettingsWindow:
         self.district_combo = ctk.CTkComboBox(district_frame, width=160, values=[])
         self.district_combo.pack(side='left', padx=5)
         self.district_combo.set(loc['district']['name'])
+        if current_city := next((c for c in Tools.get_cities() 
+                               if c['id'] == loc['city']['id']), None):
+            self.district_mapping[loc['district']['name']] = {
+                "label": loc['district']['name'], "city": current_city, "district": loc['district']}
         
         ctk.CTkButton(district_frame, text="Kaydet", width=100,
                      command=self._save_location).pack(side='right', padx=5)
@@ -118,41 +119,64 @@ class SettingsWindow:
         self.status = ctk.CTkLabel(self.window, text="Vakitleri güncellemek için ilçe seçiniz")
         self.status.pack(side='top', padx=5)
 
+    def reload(self, settings):
+        """Ayarlar dışarıdan değiştiğinde pencereyi yeni değerlerle yeniden kurar."""
+        self._settings = settings
+        self.district_mapping = {}
+        for child in self.window.winfo_children():
+            child.destroy()
+        self._init_ui()
+        self._show_status("Ayarlar dışarıdan güncellendi", "info")
+
+    def _search_locations(self, event=None):
+        query = self.city_entry.get().strip()
+        if not query:
+            return
+        results = Tools.get_location_index().search(query)
+        self._show_results(results)
+        if not results:
+            pending = getattr(self.root, 'clock_widget', None) and Tools.missing_district_cities()
+            self._show_status("Sonuç bulunamadı" + (" (ilçe listesi indiriliyor)" if pending else ""), "error")
+
+    def _show_results(self, results):
+        self.district_mapping = {r['label']: r for r in results}
+        labels = list(self.district_mapping)
+        self.district_combo.configure(values=labels)
+        if labels:
+            self.district_combo.set(labels[0])
+            self._show_status(f"{len(labels)} sonuç", "info")
+
     def _fetch_districts(self):
-        city_code = self.city_entry.get().strip()
-        if not city_code:
-            return self._show_status("Plaka kodu giriniz!", "error")
+        selected = self.district_mapping.get(self.district_combo.get())
+        if not selected:
+            return self._show_status("Önce il veya ilçe arayınız!", "error")
             
-        if city := next((c for c in Tools.get_cities() if c['plaka'] == city_code), None):
-            if districts := DiyanetApi().get_districts(city['id']):
-                self.district_mapping = districts
-                district_names = list(districts.keys())
-                self.district_combo.configure(values=district_names)
-                self.district_combo.set(district_names[0])
-                self._show_status(f"{len(districts)} ilçe bulundu", "success")
-            else:
-                self._show_status("İlçeler alınamadı!", "error")
+        city = selected['city']
+        if districts := DiyanetApi().get_districts(city['id']):
+            Tools.update_districts(city['id'], districts)
+            self._show_results(Tools.get_location_index().search(city['plaka'], limit=None))
+            self._show_status(f"{len(districts)} ilçe bulundu", "success")
         else:
-            self._show_status("Geçersiz plaka kodu!", "error")
+            self._show_status("İlçeler alınamadı!", "error")
 
     def _save_location(self):
-        city_code = self.city_entry.get().strip()
-        district_name = self.district_combo.get()
+        selected = self.district_mapping.get(self.district_combo.get())
         
-        if not (city_code and district_name in self.district_mapping):
-            return self._show_status("Geçerli il ve ilçe seçiniz!", "error")
+        if not (selected and selected['district']):
+            return self._show_status("Geçerli ilçe seçiniz! (Gerekirse ilçeleri getirin)", "error")
             
-        if city := next((c for c in Tools.get_cities() if c['plaka'] == city_code), None):
-            self._settings['LOCATION'].update({
-                'city': {'name': city['il'], 'id': city['id']},
-                'district': {'name': district_name, 'id': self.district_mapping[district_name]}
-            })
-            self._save_settings("Konum kaydedildi")
+        city = selected['city']
+        self._settings['LOCATION'].update({
+            'city': {'name': city['il'], 'id': city['id']},
+            'district': {'name': selected['district']['name'], 'id': selected['district']['id']}
+        })
+        self._save_settings("Konum kaydedildi")
 
     def _update_times(self):
-        if times := DiyanetApi().fetch_prayer_times(self._settings['LOCATION']['district']['id']):
-            Tools.update_prayer_times(times)
-            self._show_status("Vakitler güncellendi", "success")
+        district_id = self._settings['LOCATION']['district']['id']
+        if times := DiyanetApi().fetch_yearly_prayer_times(district_id):
+            Tools.update_prayer_archive(district_id, times)
+            self._show_status(f"Vakitler güncellendi ({len(times)} gün)", "success")
             if hasattr(self.root, 'clock_widget'):
                 self.root.clock_widget._prayer_times = Tools.get_prayer_times()
                 self.root.clock_widget._next_prayer_time = Tools.find_next_prayer_time(self.root.clock_widget._prayer_times)
@@ -0,0 +1,128 @@
+import os
+import mmap
+import struct
+import logging as logger
+from datetime import date
+from multiprocessing import shared_memory
+from timetable_validator import TimetableValidator
+
+
+class SharedSchedule:
+    """Derlenmiş vakit çizelgesini paylaşımlı bellekte yayınlar (çok kullanıcılı terminal sunucuları için).
+
+    Her gün, tarih sıra numarası ve gece yarısından itibaren dakika cinsinden altı
+    vakit olarak sabit boyutlu bir kayıtta tutulur; okuyan kopyalar JSON ayrıştırmaz.
+    Segment adı ilçeye göre belirlenir, böylece farklı ilçeler birbirine karışmaz.
+
+    Sadece POSIX'te (Linux/macOS) desteklenir: segmenti yalnızca oluşturan kullanıcı
+    yazabilir (0644), diğerleri salt okunur eşler ve veriyi doğrulamadan kullanmaz.
+    Yayıncı kapanırken segmenti siler; sıradaki kopya yeniden yayınlar. Windows'ta segmentler
+    oturuma özeldir ve varsayılan güvenlik ayarı başka kullanıcıların açmasına izin
+    vermez; orada özellik kapalıdır.
+    """
+    MAGIC = b"NZ01"
+    HEADER = struct.Struct("<4sI")  # sihirli değer, gün sayısı
+    RECORD = struct.Struct("<I6H")  # date.toordinal(), 6 vakit (dakika)
+    CAPACITY = 400  # gün; segment sonradan büyütülemediği için bir yılı rahat kapsar
+    MODE = 0o644  # Herkes okuyabilsin, sadece yayıncı yazabilsin
+
+    @staticmethod
+    def is_supported():
+        return os.name == 'posix'
+
+    def __init__(self, district_id):
+        self.name = f"namaz_zaman_{district_id}"
+        self._segment = None  # Yayıncı açık tuttuğu sürece segment yaşar
+        self._created = False  # Segmenti bu süreç mi oluşturdu (kapanışta silinir)
+
+    @classmethod
+    def _size(cls):
+        return cls.HEADER.size + cls.CAPACITY * cls.RECORD.size
+
+    def publish(self, prayer_times):
+        days = sorted(prayer_times.items())[:self.CAPACITY]
+        try:
+            if self._segment is None:
+                try:
+                    self._segment = shared_memory.SharedMemory(self.name, create=True, size=self._size())
+                    self._created = True
+                    # shm_open 0600 ile oluşturur; diğer kullanıcılar okuyabilsin
+                    os.fchmod(self._segment._fd, self.MODE)
+                except FileExistsError:
+                    try:
+                        self._segment = self._attach()  # Önceki bir çalıştırmadan kalan kendi segmentimiz
+                    except PermissionError:
+                        logger.info(f"{self.name} başka bir kullanıcı tarafından yayınlanıyor.")
+                        return
+            buffer = self._segment.buf
+            # Önce gün sayısını sıfırla, kayıtları yaz, en son sayıyı güncelle; okuyan yarım veri görmez
+            self.HEADER.pack_into(buffer, 0, self.MAGIC, 0)
+            for i, (day, times) in enumerate(days):
+                minutes = [int(t[:2]) * 60 + int(t[3:5]) for t in times]
+                self.RECORD.pack_into(buffer, self.HEADER.size + i * self.RECORD.size,
+                                      date.fromisoformat(day).toordinal(), *minutes)
+            self.HEADER.pack_into(buffer, 0, self.MAGIC, len(days))
+            logger.info(f"Vakitler paylaşımlı belleğe yazıldı: {self.name} ({len(days)} gün)")
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Paylaşımlı bellek yazılamadı: {e}")
+
+    def read(self):
+        """Yayınlanmış çizelgeyi {tarih: ["HH:MM", ...]} olarak döndürür; yoksa None."""
+        if self._segment is not None:
+            return self._decode(self._segment.buf)
+        try:
+            buffer = self._map_readonly()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Paylaşımlı belleğe erişilemiyor ({self.name}): {e}")
+            return None
+        with buffer:
+            return self._decode(buffer)
+
+    def _decode(self, buffer):
+        try:
+            magic, count = self.HEADER.unpack_from(buffer, 0)
+            if magic != self.MAGIC or not count:
+                return None
+            data = {}
+            for i in range(min(count, self.CAPACITY)):
+                ordinal, *minutes = self.RECORD.unpack_from(buffer, self.HEADER.size + i * self.RECORD.size)
+                data[date.fromordinal(ordinal).isoformat()] = [f"{m // 60:02}:{m % 60:02}" for m in minutes]
+            # Başka bir sürecin yazdığı içerik güvenilmeden önce doğrulanır
+            return data if TimetableValidator().is_valid(data, f"Paylaşımlı bellek ({self.name})") else None
+        except (ValueError, OverflowError, struct.error) as e:
+            logger.error(f"Paylaşımlı bellek okunamadı: {e}")
+            return None
+
+    def _map_readonly(self):
+        """Segmenti salt okunur eşler; okuma-yazma izni gerekmez ve resource_tracker'a kaydolmaz."""
+        import _posixshmem
+        fd = _posixshmem.shm_open("/" + self.name, os.O_RDONLY, mode=0)
+        try:
+            return mmap.mmap(fd, os.fstat(fd).st_size, mmap.MAP_SHARED, mmap.PROT_READ)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """Yayıncı kapanırken segmenti bırakır; oluşturduysa siler (aksi halde sızıntı uyarısı çıkar)."""
+        if self._segment is None:
+            return
+        try:
+            self._segment.close()
+            if self._created:
+                self._segment.unlink()
+        except OSError as e:
+            logger.error(f"Paylaşımlı bellek kapatılamadı: {e}")
+        self._segment = None
+        self._created = False
+
+    def _attach(self):
+        segment = shared_memory.SharedMemory(self.name)
+        try:
+            # Python < 3.13 bağlanan süreci de izler ve çıkışta segmenti siler; bunu engelle
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        except (ImportError, AttributeError, KeyError):
+            pass
+        return segment
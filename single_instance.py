@@ -0,0 +1,102 @@
+import os
+import hmac
+import time
+import socket
+import secrets
+import threading
+import logging as logger
+
+
+class SingleInstance:
+    """Kilit dosyası ve yerel soket ile programın tek kopya çalışmasını sağlar.
+
+    İlk açılan kopya kilidi alır ve 127.0.0.1 üzerinde bir port dinler; port numarası
+    ve rastgele bir anahtar kullanıcıya özel klasördeki bir dosyaya yazılır. Sonraki
+    açılışlar kilidi alamaz, isteğini ("settings", "refresh" gibi) anahtarla birlikte
+    bu porta iletip kapanır. Anahtarı bilmeyen (başka kullanıcıların) bağlantıları yok sayılır.
+    """
+    COMMANDS = ("show", "settings", "refresh", "quit")
+
+    def __init__(self, lock_path, port_path):
+        self.lock_path = lock_path
+        self.port_path = port_path
+        self._lock_file = None
+        self._server = None
+        self._token = None
+
+    def acquire(self):
+        """Kilit alındıysa True döner; bu durumda çalışan kopya bu süreçtir."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self._lock_file = open(self.lock_path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        return True
+
+    def serve(self, on_command):
+        """Diğer kopyalardan gelen komutları dinler. `on_command` dinleyici thread'inde çağrılır."""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        port = self._server.getsockname()[1]
+        self._token = secrets.token_hex(16)
+        fd = os.open(self.port_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(f"{port} {self._token}")
+        logger.info(f"Tek kopya sunucusu {port} portunda dinliyor.")
+        threading.Thread(target=self._accept_loop, args=(on_command,),
+                         name="SingleInstance", daemon=True).start()
+
+    def _accept_loop(self, on_command):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # Sunucu kapatıldı
+            with conn:
+                conn.settimeout(1.0)
+                try:
+                    message = conn.recv(128).decode('utf-8', errors='replace').split()
+                except OSError:
+                    continue
+            token, command = (message + ["", ""])[:2]
+            if not hmac.compare_digest(token.encode(), self._token.encode()):
+                logger.warning("Anahtarı geçersiz bir bağlantı reddedildi.")
+            elif command in self.COMMANDS:
+                logger.info(f"Başka bir kopyadan komut alındı: {command}")
+                on_command(command)
+            else:
+                logger.warning(f"Bilinmeyen komut yok sayıldı: {command!r}")
+
+    def send(self, command, timeout=3.0):
+        """Çalışan kopyaya komut gönderir. Port dosyası henüz yazılmadıysa kısa süre bekler."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                port, token = self.port_path.read_text(encoding='utf-8').split()
+                with socket.create_connection(("127.0.0.1", int(port)), timeout=1.0) as conn:
+                    conn.sendall(f"{token} {command}".encode('utf-8'))
+                return True
+            except (OSError, ValueError) as e:
+                if time.monotonic() > deadline:
+                    logger.error(f"Çalışan kopyaya ulaşılamadı: {e}")
+                    return False
+                time.sleep(0.2)
+
+    def release(self):
+        if self._server:
+            self._server.close()
+            self._server = None
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+            self.port_path.unlink(missing_ok=True)
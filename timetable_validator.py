@@ -0,0 +1,77 @@
+import logging as logger
+from datetime import date
+
+
+class TimetableValidator:
+    """İndirilen vakit tablosunu önbelleğe yazılmadan önce toptan doğrular.
+
+    Vakitler dakikaya çevrilip her vakit için bir sütun halinde tutulur; sıralama ve
+    günden güne kayma kontrolleri satır satır değil, bu sütunlar yan yana gezilerek
+    tüm tablo üzerinde yapılır. Maliyet gün sayısıyla doğrusal artar (bir yıl birkaç ms).
+    """
+    PRAYER_COUNT = 6
+    MAX_DAILY_DELTA = 15  # dakika; aynı vaktin bir günden ertesine en fazla kayması
+
+    def validate(self, prayer_times):
+        """Hata mesajlarının listesini döndürür; boş liste tablonun geçerli olduğunu gösterir."""
+        if not isinstance(prayer_times, dict) or not prayer_times:
+            return ["Vakit tablosu boş"]
+
+        errors = []
+        ordinals, rows = [], []
+        for day, times in sorted(prayer_times.items()):
+            try:
+                parsed = date.fromisoformat(day)
+            except (TypeError, ValueError):
+                parsed = None
+            # 3.11'de "20241105" ve "2024-W45-2" de kabul edilir; vakitler "YYYY-MM-DD" ile aranır
+            if parsed is None or parsed.isoformat() != day:
+                errors.append(f"Geçersiz tarih: {day}")
+                continue
+            ordinal = parsed.toordinal()
+            minutes = self._to_minutes(times)
+            if minutes is None:
+                errors.append(f"{day}: {self.PRAYER_COUNT} geçerli vakit yok ({times})")
+                continue
+            ordinals.append(ordinal)
+            rows.extend(minutes)
+        if errors:
+            return errors
+
+        columns = [rows[k::self.PRAYER_COUNT] for k in range(self.PRAYER_COUNT)]
+
+        # Tarihler ardışık olmalı
+        errors += [f"Eksik gün: {date.fromordinal(a).isoformat()} ile {date.fromordinal(b).isoformat()} arası"
+                   for a, b in zip(ordinals, ordinals[1:]) if b - a != 1]
+
+        # Her gün vakitler kesin artan olmalı (imsak < güneş < ... < yatsı)
+        for earlier, later in zip(columns, columns[1:]):
+            errors += [f"{date.fromordinal(d).isoformat()}: vakitler sıralı değil"
+                       for d, a, b in zip(ordinals, earlier, later) if b <= a]
+
+        # Aynı vakit günden güne makul ölçüde değişmeli
+        for k, column in enumerate(columns):
+            errors += [f"{date.fromordinal(d).isoformat()}: {k + 1}. vakit {b - a:+} dk kaydı"
+                       for d, a, b in zip(ordinals[1:], column, column[1:])
+                       if abs(b - a) > self.MAX_DAILY_DELTA]
+        return errors
+
+    def is_valid(self, prayer_times, source="Vakit tablosu"):
+        if errors := self.validate(prayer_times):
+            logger.error(f"{source} reddedildi ({len(errors)} hata): {'; '.join(errors[:5])}")
+            return False
+        return True
+
+    def _to_minutes(self, times):
+        if not isinstance(times, list) or len(times) != self.PRAYER_COUNT:
+            return None
+        try:
+            minutes = []
+            for time_str in times:
+                hours, mins = time_str.split(":")
+                if not (len(hours) == len(mins) == 2 and 0 <= int(hours) < 24 and 0 <= int(mins) < 60):
+                    return None
+                minutes.append(int(hours) * 60 + int(mins))
+            return minutes
+        except (AttributeError, ValueError):
+            return None
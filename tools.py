@@ -1,8 +1,23 @@
 
+import os
+import sys
 import json
 import logging as logger
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+from prayer_archive import PrayerArchive
+from shared_schedule import SharedSchedule
+from location_index import LocationIndex
+from timetable_validator import TimetableValidator
+
+
+def _runtime_dir():
+    """Kullanıcıya özel çalışma klasörü; tek kopya kilidi çalışma dizininden bağımsız olsun."""
+    if os.name == 'nt':
+        return Path(os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local') / 'NamazZamani'
+    if sys.platform == 'darwin':
+        return Path.home() / 'Library' / 'Application Support' / 'NamazZamani'
+    return Path(os.environ.get('XDG_RUNTIME_DIR') or Path.home() / '.cache') / 'namaz-zamani'
 
 
 class Tools:
@@ -10,10 +25,21 @@ class Tools:
     BASE_DIR = Path.cwd()
     LOG_FILE = BASE_DIR / 'app.log'
     SETTINGS = BASE_DIR / 'ayarlar.json'
+    RUNTIME_DIR = _runtime_dir()
+    LOCK_FILE = RUNTIME_DIR / 'namaz.lock'
+    PORT_FILE = RUNTIME_DIR / 'namaz.port'
     PRAYER_TIMES = BASE_DIR / 'vakitler.json'
+    PRAYER_ARCHIVE = BASE_DIR / 'vakitler.arsiv'
+    DISTRICTS = BASE_DIR / 'ilceler.json'
 
     _settings = None
+    _own_writes = {}  # {çözülmüş yol: file_stat} bu sürecin son yazdığı sürümler
     _prayer_times = None
+    _prayer_window = None  # Bellekteki vakitlerin ait olduğu ay ("2024-11")
+    _archive = None
+    _shared_schedule = None
+    _districts = None  # {il_id: {ilçe_adı: ilçe_id}}
+    _location_index = None
     _cities = [
         {"plaka": "01", "il": "Adana", "id": "500"},
         {"plaka": "02", "il": "Adıyaman", "id": "501"},
@@ -108,7 +134,8 @@ class Tools:
                     "always_on_top": True,
                     "snap_distance": 20,
                     "orientation": "horizontal", 
-                    "show_seconds": True}
+                    "show_seconds": True},
+        "INSTANCE": {"shared_schedule": False}  # Terminal sunucularında vakitleri kullanıcılar arasında paylaş
     }
 
     @staticmethod
@@ -120,23 +147,140 @@ class Tools:
     @classmethod
     def get_settings(cls):
         if cls._settings is None:
-            cls._settings = cls.load_json(cls.SETTINGS) or cls.create_default_settings()
+            settings = cls.load_json(cls.SETTINGS) or cls.create_default_settings()
+            # Yeni eklenen anahtarlar eski dosyalarda yok; bir kez doldurup kaydet
+            filled = json.loads(json.dumps(settings))
+            cls._fill_missing_settings(cls._default_settings, filled)
+            if filled != settings:
+                cls.save_json(cls.SETTINGS, filled)
+            cls._settings = filled
         return cls._settings
 
     @classmethod
     def get_cities(cls):
         return cls._cities
 
+    @classmethod
+    def get_districts(cls):
+        if cls._districts is None:
+            cls._districts = (cls.DISTRICTS.exists() and cls.load_json(cls.DISTRICTS)) or {}
+        return cls._districts
+
+    @classmethod
+    def update_districts(cls, city_id, districts):
+        """Bir ilin ilçelerini önbelleğe ekler; arama indeksi bir sonraki aramada yeniden kurulur."""
+        cls.update_districts_many({city_id: districts})
+
+    @classmethod
+    def update_districts_many(cls, districts_by_city):
+        cache = cls.get_districts()
+        cache.update({str(city_id): districts for city_id, districts in districts_by_city.items()})
+        cls.save_json(cls.DISTRICTS, cache)
+        cls._location_index = None
+
+    @classmethod
+    def missing_district_cities(cls):
+        """İlçe listesi henüz önbellekte olmayan iller."""
+        cache = cls.get_districts()
+        return [city for city in cls._cities if not cache.get(city['id'])]
+
+    @classmethod
+    def get_location_index(cls):
+        if cls._location_index is None:
+            cls._location_index = LocationIndex(cls._cities, cls.get_districts())
+        return cls._location_index
+
     @classmethod
     def get_prayer_times(cls):
-        if cls._prayer_times is None:
-            cls._prayer_times = cls.load_json(cls.PRAYER_TIMES) or {}
+        """Bugünü kapsayan vakitleri döndürür; ay değişince yeniden seçer.
+
+        Öncelik: vakitler.json (dışarıdan gönderilen dosya kazanır), ilçesi ayarlarla
+        aynı olan arşivden bu ay ile sonraki ay, en son paylaşımlı bellek. Hiçbiri
+        bugünü kapsamıyorsa vakitler.json olduğu gibi kullanılır.
+        """
+        today = date.today()
+        if cls._prayer_times is None or cls._prayer_window != PrayerArchive.month_key(today):
+            today_str = today.isoformat()
+            archive = cls.get_archive()
+            shared = cls.get_shared_schedule()
+            district_id = cls.get_settings()["LOCATION"]["district"]["id"]
+            if today_str in (times := cls.load_json(cls.PRAYER_TIMES) or {}):
+                cls._prayer_times = times
+                cls.publish_prayer_times()
+            elif archive and archive.index.get("district_id") == str(district_id) and archive.covers(today):
+                cls._prayer_times = archive.get_window(today)
+                logger.info(f"Vakitler arşivden yüklendi: {len(cls._prayer_times)} gün.")
+                cls.publish_prayer_times()
+            elif shared and (shared_times := shared.read()) and today_str in shared_times:
+                cls._prayer_times = shared_times
+                logger.info(f"Vakitler paylaşımlı bellekten alındı: {len(shared_times)} gün.")
+            else:
+                logger.warning("Bugünü kapsayan vakit bulunamadı.")
+                cls._prayer_times = times
+            cls._prayer_window = PrayerArchive.month_key(today)
         return cls._prayer_times
 
+    @classmethod
+    def get_shared_schedule(cls):
+        """Ayarlarda açıksa seçili ilçenin paylaşımlı bellek segmentini döndürür."""
+        settings = cls.get_settings()
+        if not settings.get("INSTANCE", {}).get("shared_schedule"):
+            return None
+        if not SharedSchedule.is_supported():
+            if cls._shared_schedule is None:
+                logger.warning("Paylaşımlı vakitler bu işletim sisteminde desteklenmiyor, kapalı.")
+                cls._shared_schedule = False
+            return None
+        district_id = settings["LOCATION"]["district"]["id"]
+        if not cls._shared_schedule or cls._shared_schedule.name != SharedSchedule(district_id).name:
+            cls.close_shared_schedule()  # İlçe değiştiyse eski segmenti bırak
+            cls._shared_schedule = SharedSchedule(district_id)
+        return cls._shared_schedule
+
+    @classmethod
+    def close_shared_schedule(cls):
+        if cls._shared_schedule:
+            cls._shared_schedule.close()
+
+    @classmethod
+    def publish_prayer_times(cls):
+        if (shared := cls.get_shared_schedule()) and cls._prayer_times:
+            shared.publish(cls._prayer_times)
+
+    @classmethod
+    def get_archive(cls):
+        if cls._archive is None and cls.PRAYER_ARCHIVE.exists():
+            cls._archive = PrayerArchive(cls.PRAYER_ARCHIVE)
+        return cls._archive
+
     @classmethod
     def update_prayer_times(cls, new_times):
         cls.save_json(cls.PRAYER_TIMES, new_times)
+        cls.update_prayer_times_cache(new_times)
+
+    @classmethod
+    def invalidate_prayer_times(cls):
+        """Bir sonraki get_prayer_times çağrısında kaynak (dosya/arşiv) yeniden seçilsin."""
+        cls._prayer_window = None
+
+    @classmethod
+    def update_prayer_times_cache(cls, new_times):
         cls._prayer_times = new_times
+        cls._prayer_window = PrayerArchive.month_key(date.today())
+        cls.publish_prayer_times()
+
+    @classmethod
+    def update_prayer_archive(cls, district_id, new_times):
+        """Yıllık vakitleri sıkıştırılmış arşive, güncel pencereyi vakitler.json'a yazar."""
+        cls._archive = PrayerArchive.save(cls.PRAYER_ARCHIVE, district_id, new_times)
+        cls.update_prayer_times(cls._archive.get_window(date.today()) or new_times)
+        return cls._prayer_times
+
+    @classmethod
+    def archive_is_stale(cls):
+        """Arşiv yoksa, başka ilçeye aitse, geçen yıl indirildiyse veya bugünü kapsamıyorsa True."""
+        archive = cls.get_archive()
+        return not (archive and archive.is_fresh(cls.get_settings()["LOCATION"]["district"]["id"]))
 
     @classmethod
     def update_settings(cls, new_settings):
@@ -146,7 +290,7 @@ class Tools:
     @classmethod
     def create_default_settings(cls):
         cls.save_json(cls.SETTINGS, cls._default_settings)
-        return cls._default_settings
+        return json.loads(json.dumps(cls._default_settings))  # Varsayılanlar değişmesin diye kopya
 
     @staticmethod
     def load_json(file_path):
@@ -163,9 +307,107 @@ class Tools:
 
     @staticmethod
     def save_json(file_path, data):
-        with open(file_path, 'w', encoding='utf-8') as file:
+        # Önce geçici dosyaya yaz, sonra yerine taşı; izleyiciler yarım dosya görmesin.
+        # Sembolik bağ varsa bağın kendisi değil hedefi değiştirilir.
+        target = file_path.resolve()
+        tmp_path = target.with_name(target.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as file:
             json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
-            logger.info(f"{file_path} dosyası kaydedildi.")
+        tmp_path.replace(target)
+        Tools._own_writes[str(file_path.resolve())] = Tools.file_stat(file_path)
+        logger.info(f"{file_path} dosyası kaydedildi.")
+
+    @staticmethod
+    def file_stat(file_path):
+        """Dosyanın sürümünü ayırt etmek için (inode, mtime, boyut); yoksa None."""
+        try:
+            st = file_path.stat()
+            return st.st_ino, st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    @classmethod
+    def is_own_write(cls, file_path, stat):
+        return stat is not None and cls._own_writes.get(str(file_path.resolve())) == stat
+
+    @classmethod
+    def load_for_reload(cls, file_path):
+        """Dışarıdan değişen dosyayı okuyup doğrular.
+
+        (veri, okunan sürüm) döner; geçersizse veri None olur, önbellek bozulmaz.
+        Sürüm, uygulamadan önce dosyanın o arada yeniden yazılıp yazılmadığını anlamak içindir.
+        """
+        stat = cls.file_stat(file_path)
+        if cls.is_own_write(file_path, stat):
+            return None, stat  # Bu sürecin kendi kaydı
+        data = cls.load_json(file_path)
+        if file_path.resolve() == cls.SETTINGS.resolve():
+            return cls.validate_settings(data), stat
+        if file_path.resolve() == cls.PRAYER_TIMES.resolve():
+            return cls.validate_prayer_times(data), stat
+        return None, stat
+
+    @classmethod
+    def validate_settings(cls, data):
+        """Eksikleri varsayılanla doldurur; türü yanlış bir değer varsa None döner.
+
+        Renklerin Tk tarafından çözülebildiği ayrıca ClockWidget.apply_settings'te ana thread'de kontrol edilir.
+        """
+        if not isinstance(data, dict):
+            return None
+        settings = json.loads(json.dumps(data))  # Derin kopya
+        try:
+            cls._fill_missing_settings(cls._default_settings, settings)
+            errors = cls._settings_errors(settings)
+        except (KeyError, TypeError, AttributeError) as e:
+            errors = [f"yapı hatalı ({e!r})"]
+        if errors:
+            logger.error(f"{cls.SETTINGS.name} geçersiz, yok sayıldı: {'; '.join(errors)}")
+            return None
+        return settings
+
+    @staticmethod
+    def _settings_errors(settings):
+        def is_int(value):
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        errors = []
+        for key in ("standard", "warning", "critical"):
+            colors = settings["COLORS"][key]
+            for ctype in ("background", "text"):
+                if not (isinstance(colors[ctype], str) and colors[ctype].strip()):
+                    errors.append(f"COLORS.{key}.{ctype} renk değil")
+            if key != "standard" and not (is_int(colors["trigger"]) and colors["trigger"] > 0):
+                errors.append(f"COLORS.{key}.trigger pozitif tam sayı olmalı")
+
+        font = settings["FONTS"]["clock"]
+        if not (isinstance(font["family"], str) and font["family"]):
+            errors.append("FONTS.clock.family yazı olmalı")
+        if not (is_int(font["size"]) and font["size"] > 0):
+            errors.append("FONTS.clock.size pozitif tam sayı olmalı")
+        if font["weight"] not in ("normal", "bold"):
+            errors.append("FONTS.clock.weight normal veya bold olmalı")
+
+        display = settings["DISPLAY"]
+        if not (isinstance(display["position"], dict)
+                and all(is_int(display["position"].get(axis)) for axis in ("x", "y"))):
+            errors.append("DISPLAY.position x ve y tam sayı olmalı")
+        if display["orientation"] not in ("horizontal", "vertical"):
+            errors.append("DISPLAY.orientation horizontal veya vertical olmalı")
+        for key in ("always_on_top", "show_seconds"):
+            if not isinstance(display[key], (bool, int)):
+                errors.append(f"DISPLAY.{key} true/false olmalı")
+        if not (is_int(display["snap_distance"]) and display["snap_distance"] >= 0):
+            errors.append("DISPLAY.snap_distance sıfır veya pozitif tam sayı olmalı")
+
+        for key in ("city", "district"):
+            if not isinstance(settings["LOCATION"][key].get("id"), (str, int)):
+                errors.append(f"LOCATION.{key}.id eksik")
+        return errors
+
+    @classmethod
+    def validate_prayer_times(cls, data):
+        return data if TimetableValidator().is_valid(data, cls.PRAYER_TIMES.name) else None
 
 
 